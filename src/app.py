@@ -1,6 +1,9 @@
 import os
 import tempfile
-from typing import Any, List, Tuple
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 
 from dotenv import load_dotenv
 import gradio as gr
@@ -24,35 +27,153 @@ load_dotenv()
 MODEL = os.environ.get("MODEL", "llama-3.3-70b-versatile")
 ASSETS_DIR = os.path.join(os.getcwd(), "assets")
 ARLO_ICON_PATH = os.path.join(ASSETS_DIR, "arlo.png")
+HISTORY_WINDOW_MAX = 20
+HISTORY_WINDOW_STEP = 10
+assert HISTORY_WINDOW_STEP % 2 == 0, "HISTORY_WINDOW_STEP must be even"
+TOOLS = [
+    save_to_md_file,
+    save_to_pdf_file,
+    save_to_txt_file,
+    log_workout,
+    get_exercise_progress,
+    get_last_workout,
+    delete_last_workout,
+]
+
+HISTORY_CACHE_MAX_SESSIONS = 64
+
+# Per-session (history, messages) from the previous turn, least recently used first.
+_history_cache: "OrderedDict[str, Tuple[list, list]]" = OrderedDict()
+_history_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _get_agent(model: str, temperature: float) -> Any:
+    """Build the agent once per model/temperature and reuse it across turns.
+
+    Args:
+        model (str): The Groq model name.
+        temperature (float): The sampling temperature.
+
+    Returns:
+        Any: The compiled agent.
+    """
+    llm = ChatGroq(model=model, temperature=temperature)
+    return create_agent(
+        model=llm,
+        tools=TOOLS,
+        system_prompt=SYSTEM_PROMPT,
+    )
+
+
+def _history_item_messages(item: Any) -> List[AIMessage | HumanMessage]:
+    """Convert a single history item to messages.
+
+    Args:
+        item (Any): A role/content dict or a (user, assistant) tuple.
+
+    Returns:
+        List[AIMessage | HumanMessage]: The messages for the item.
+    """
+    if isinstance(item, dict):
+        role = item.get("role")
+        content = item.get("content")
+        if role == "user":
+            return [HumanMessage(content=content)]
+        if role == "assistant":
+            return [AIMessage(content=content)]
+        return []
+    user_msg, bot_msg = item[:2]
+    return [HumanMessage(content=user_msg), AIMessage(content=bot_msg)]
 
 
 def build_history_messages(
-    history: List[Tuple[str, str]],
+    history: List[Tuple[str, str]], session_key: Optional[str] = None
 ) -> List[AIMessage | HumanMessage]:
     """Build a history message list from a list of tuples.
 
+    When a session key is given, messages built on that session's previous turn
+    are reused if its history is a prefix of this one, so only the newly
+    appended items are converted.
+
     Args:
         history (List[Tuple[str, str]]): A list of tuples.
+        session_key (Optional[str]): The chat session to cache messages for.
 
     Returns:
         List[AIMessage | HumanMessage]: A history message list.
     """
-    messages = []
-    for item in history:
-        if isinstance(item, dict):
-            role = item.get("role")
-            content = item.get("content")
-            if role == "user":
-                messages.append(HumanMessage(content=content))
-            elif role == "assistant":
-                messages.append(AIMessage(content=content))
-        else:
-            user_msg, bot_msg = item[:2]
-            messages.append(HumanMessage(content=user_msg))
-            messages.append(AIMessage(content=bot_msg))
+    cached = None
+    if session_key is not None:
+        with _history_cache_lock:
+            cached = _history_cache.get(session_key)
+
+    cached_len = 0
+    messages: List[AIMessage | HumanMessage] = []
+    if cached is not None:
+        cached_history, cached_messages = cached
+        if len(cached_history) <= len(history) and (
+            history[: len(cached_history)] == cached_history
+        ):
+            cached_len = len(cached_history)
+            messages = cached_messages[:]
+
+    for item in history[cached_len:]:
+        messages.extend(_history_item_messages(item))
+
+    if session_key is not None:
+        with _history_cache_lock:
+            _history_cache[session_key] = (list(history), messages[:])
+            _history_cache.move_to_end(session_key)
+            while len(_history_cache) > HISTORY_CACHE_MAX_SESSIONS:
+                _history_cache.popitem(last=False)
     return messages
 
 
+def window_history_messages(
+    messages: List[AIMessage | HumanMessage],
+) -> List[AIMessage | HumanMessage]:
+    """Trim history to an append-only window of at most HISTORY_WINDOW_MAX messages.
+
+    Once the window is full its start jumps forward by HISTORY_WINDOW_STEP messages
+    instead of sliding by one message per turn, so consecutive turns share the same
+    prefix and the provider's prompt cache keeps hitting it.
+
+    Args:
+        messages (List[AIMessage | HumanMessage]): The full history message list.
+
+    Returns:
+        List[AIMessage | HumanMessage]: The windowed history message list.
+    """
+    overflow = len(messages) - HISTORY_WINDOW_MAX
+    if overflow <= 0:
+        return messages
+    start = -(-overflow // HISTORY_WINDOW_STEP) * HISTORY_WINDOW_STEP
+    # Start on a user message even if the history does not strictly alternate.
+    while start < len(messages) and not isinstance(messages[start], HumanMessage):
+        start += 1
+    return messages[start:]
+
+
+def _join_content_parts(content: List[Any]) -> str:
+    """Join list content parts into a single string.
+
+    Args:
+        content (List[Any]): The content parts.
+
+    Returns:
+        str: The joined content.
+    """
+    return "".join(map(str, content))
+
+
+_CONTENT_CONVERTERS = {
+    str: lambda content: content,
+    type(None): lambda content: "",
+    list: _join_content_parts,
+}
+
+
 def content_to_text(content: Any) -> str:
     """Convert a content of any type to a text string.
 
@@ -62,12 +183,11 @@ def content_to_text(content: Any) -> str:
     Returns:
         str: Content converted to text string.
     """
-    if content is None:
-        return ""
-    if isinstance(content, str):
-        return content
+    converter = _CONTENT_CONVERTERS.get(type(content))
+    if converter is not None:
+        return converter(content)
     if isinstance(content, list):
-        return "".join(str(part) for part in content)
+        return _join_content_parts(content)
     return str(content)
 
 
@@ -80,26 +200,25 @@ def extract_generated_files(messages: List[Any]) -> List[str]:
     Returns:
         List[str]: A list of file paths.
     """
-    found: list[str] = []
-
-    for m in messages or []:
+    for m in reversed(messages or []):
         if not isinstance(m, ToolMessage):
             continue
 
         # The save tool returns the file path directly
         text = content_to_text(m.content).strip()
         if text and os.path.isfile(text):
-            found.append(text)
+            return [text]
 
-    return [found[-1]] if found else []
+    return []
 
 
-def chat(message: str, history: List) -> Any:
+def chat(message: str, history: List, request: Optional[gr.Request] = None) -> Any:
     """Entrypoint function for chat.
 
     Args:
         message (str): Message to send.
         history (List[Tuple[str, str]]): A list of tuples containing history messages.
+        request (Optional[gr.Request]): The Gradio request, used to key per-session caches.
 
     Returns:
         Any: Assistant text, or a dict with `text` and `files`.
@@ -107,23 +226,12 @@ def chat(message: str, history: List) -> Any:
     if not os.environ.get("GROQ_API_KEY"):
         return "Missing GROQ_API_KEY environment variable."
 
-    llm = ChatGroq(model=MODEL, temperature=0.3)
+    agent = _get_agent(MODEL, 0.3)
 
-    agent = create_agent(
-        model=llm,
-        tools=[
-            save_to_md_file,
-            save_to_pdf_file,
-            save_to_txt_file,
-            log_workout,
-            get_exercise_progress,
-            get_last_workout,
-            delete_last_workout,
-        ],
-        system_prompt=SYSTEM_PROMPT,
+    session_key = request.session_hash if request is not None else None
+    state_messages = window_history_messages(
+        build_history_messages(history, session_key)
     )
-
-    state_messages = build_history_messages(history)
     state_messages.append(HumanMessage(content=message))
 
     try:
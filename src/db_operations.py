@@ -1,33 +1,79 @@
+import atexit
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from workout_validation import SetEntry, WorkoutLog
 
 DB_PATH = os.environ.get("FITNESS_DB_PATH", "fitness.db")
+_INSERT_SETS_SQL = """
+    INSERT INTO sets (
+        workout_id, exercise_name, set_number, reps, weight, duration_minutes, distance_km, notes
+    ) VALUES
+"""
+_SET_ROW_PLACEHOLDERS = "(?, ?, ?, ?, ?, ?, ?, ?)"
+# Keep each statement under SQLite's historical 999 bound-parameter limit.
+_MAX_SET_ROWS_PER_INSERT = 999 // 8
 
+_conn: Optional[sqlite3.Connection] = None
+_conn_lock = threading.Lock()
 
-@contextmanager
-def get_conn():
-    """Get a database connection."""
+
+def _open_conn() -> sqlite3.Connection:
+    """Open a database connection and apply the per-connection PRAGMAs.
+
+    Returns:
+        sqlite3.Connection: The configured database connection.
+    """
     parent = os.path.dirname(DB_PATH)
     if parent:
         os.makedirs(parent, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    # Shared across threads; get_conn serializes access with _conn_lock.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.execute("PRAGMA foreign_keys = ON;")
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -20000;")
+    return conn
+
+
+def _get_shared_conn() -> sqlite3.Connection:
+    """Get the process-wide connection, opening it on first use.
+
+    Must be called with _conn_lock held.
+
+    Returns:
+        sqlite3.Connection: The shared database connection.
+    """
+    global _conn
+
+    if _conn is None:
+        _conn = _open_conn()
+        atexit.register(_conn.close)
+    return _conn
+
+
+@contextmanager
+def get_conn():
+    """Get the shared database connection, committing on success and rolling back on error."""
+    with _conn_lock:
+        conn = _get_shared_conn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
 
 def init_db():
     """Initialize the database."""
     with get_conn() as conn:
+        # WAL is persisted in the database file, so it only needs setting once.
+        conn.execute("PRAGMA journal_mode = WAL;")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS workouts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -50,59 +96,85 @@ def init_db():
                 FOREIGN KEY(workout_id) REFERENCES workouts(id) ON DELETE CASCADE
             )
         """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sets_exercise_nocase "
+            "ON sets(exercise_name COLLATE NOCASE, workout_id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sets_workout ON sets(workout_id, id)"
+        )
 
 
-def create_workout(workout_date: str, notes: str = "") -> int:
-    """Create a new workout with a given date and notes.
+def _set_params(
+    workout_id: int, exercise_name: str, sets: Iterable[SetEntry]
+) -> List[Tuple[Any, ...]]:
+    """Build the sets INSERT parameters for one exercise.
 
     Args:
-        workout_date (str): The date of the workout.
-        notes (str): The notes to add to the workout.
+        workout_id (int): The workout id.
+        exercise_name (str): The name of the exercise.
+        sets (Iterable[SetEntry]): The sets of the exercise.
 
     Returns:
-        int: The new workout id.
+        List[Tuple[Any, ...]]: One parameter tuple per set.
     """
-    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
-    with get_conn() as conn:
-        cur = conn.execute(
-            "INSERT INTO workouts (workout_date, notes, created_at) VALUES (?, ?, ?)",
-            (workout_date, notes or None, created_at),
+    return [
+        (
+            workout_id,
+            exercise_name,
+            s.set_number or i,
+            s.reps,
+            s.weight,
+            s.duration_minutes,
+            s.distance_km,
+            s.notes,
         )
-        return int(cur.lastrowid)
+        for i, s in enumerate(sets, start=1)
+    ]
 
 
-def add_sets(
-    workout_id: int, exercise_name: str, set_rows: List[Dict[str, Any]]
-) -> None:
-    """Add sets to a workout.
+def _insert_sets(conn: sqlite3.Connection, params: List[Tuple[Any, ...]]) -> None:
+    """Insert set rows using multi-row VALUES statements.
 
     Args:
-        workout_id (int): The workout id.
-        exercise_name (str): The name of the exercise.
-        set_rows (List[Dict[str, Any]]): The list of sets to add to the workout.
+        conn (sqlite3.Connection): The database connection.
+        params (List[Tuple[Any, ...]]): One parameter tuple per set.
 
     Returns:
         None
     """
+    for start in range(0, len(params), _MAX_SET_ROWS_PER_INSERT):
+        batch = params[start : start + _MAX_SET_ROWS_PER_INSERT]
+        placeholders = ", ".join([_SET_ROW_PLACEHOLDERS] * len(batch))
+        conn.execute(
+            f"{_INSERT_SETS_SQL} {placeholders}",
+            [value for row in batch for value in row],
+        )
+
+
+def create_workout_with_entries(workout: WorkoutLog) -> int:
+    """Create a new workout and add all of its sets in a single transaction.
+
+    Args:
+        workout (WorkoutLog): The validated workout to store.
+
+    Returns:
+        int: The new workout id.
+    """
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
     with get_conn() as conn:
-        for i, s in enumerate(set_rows, start=1):
-            conn.execute(
-                """
-                INSERT INTO sets (
-                    workout_id, exercise_name, set_number, reps, weight, duration_minutes, distance_km, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    workout_id,
-                    exercise_name,
-                    int(s.get("set_number", i)),
-                    s.get("reps"),
-                    s.get("weight"),
-                    s.get("duration_minutes"),
-                    s.get("distance_km"),
-                    s.get("notes"),
-                ),
-            )
+        cur = conn.execute(
+            "INSERT INTO workouts (workout_date, notes, created_at) VALUES (?, ?, ?)",
+            (workout.workout_date, workout.notes or None, created_at),
+        )
+        workout_id = int(cur.lastrowid)
+        params = [
+            row
+            for entry in workout.entries
+            for row in _set_params(workout_id, entry.exercise_name, entry.sets)
+        ]
+        _insert_sets(conn, params)
+    return workout_id
 
 
 def get_exercise_series(exercise_name: str, limit: int = 200) -> list:
@@ -121,7 +193,7 @@ def get_exercise_series(exercise_name: str, limit: int = 200) -> list:
             SELECT w.workout_date, s.reps, s.weight, s.duration_minutes, s.distance_km
             FROM sets s
             JOIN workouts w ON w.id = s.workout_id
-            WHERE lower(s.exercise_name) = lower(?)
+            WHERE s.exercise_name = ? COLLATE NOCASE
             ORDER BY w.workout_date ASC, s.set_number ASC
             LIMIT ?
             """,
@@ -139,46 +211,42 @@ def get_last_workout_with_sets() -> Tuple[
         Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]: The last workout with the sets in it.
     """
     with get_conn() as conn:
-        workout_row = conn.execute(
+        rows = conn.execute(
             """
-            SELECT id, workout_date, notes, created_at
-            FROM workouts
-            ORDER BY id DESC, created_at DESC
-            LIMIT 1
+            SELECT w.id, w.workout_date, w.notes, w.created_at,
+                   s.exercise_name, s.set_number, s.reps, s.weight,
+                   s.duration_minutes, s.distance_km, s.notes
+            FROM workouts w
+            LEFT JOIN sets s ON s.workout_id = w.id
+            WHERE w.id = (SELECT id FROM workouts ORDER BY id DESC LIMIT 1)
+            ORDER BY s.id ASC
             """
-        ).fetchone()
-
-        if not workout_row:
-            return None, []
+        ).fetchall()
 
-        workout = {
-            "id": workout_row[0],
-            "workout_date": workout_row[1],
-            "notes": workout_row[2],
-            "created_at": workout_row[3],
-        }
+    if not rows:
+        return None, []
 
-        sets_rows = conn.execute(
-            """
-            SELECT exercise_name, set_number, reps, weight, duration_minutes, distance_km, notes
-            FROM sets
-            WHERE workout_id = ?
-            ORDER BY id ASC
-            """,
-            (workout["id"],),
-        ).fetchall()
+    first = rows[0]
+    workout = {
+        "id": first[0],
+        "workout_date": first[1],
+        "notes": first[2],
+        "created_at": first[3],
+    }
 
+    # A workout without sets comes back as a single row with NULL set columns.
     sets = [
         {
-            "exercise_name": row[0],
-            "set_number": row[1],
-            "reps": row[2],
-            "weight": row[3],
-            "duration_minutes": row[4],
-            "distance_km": row[5],
-            "notes": row[6],
+            "exercise_name": row[4],
+            "set_number": row[5],
+            "reps": row[6],
+            "weight": row[7],
+            "duration_minutes": row[8],
+            "distance_km": row[9],
+            "notes": row[10],
         }
-        for row in sets_rows
+        for row in rows
+        if row[4] is not None
     ]
     return workout, sets
 
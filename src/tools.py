@@ -1,16 +1,23 @@
+from pathlib import Path
+
+import orjson
 from langchain.tools import tool
 from markdown_pdf import MarkdownPdf, Section
 
 from db_operations import (
-    add_sets,
-    create_workout,
+    create_workout_with_entries,
     delete_last_workout_with_sets,
     get_exercise_series,
     get_last_workout_with_sets,
 )
-from utils import build_file_path, merge_set_notes, normalize_date_input
+from utils import build_file_path, normalize_date_input
 from workout_validation import validate_and_normalize_workout_payload
 
+_REPS_NA = "reps n/a"
+_WEIGHT_NA = "weight n/a"
+_DURATION_NA = "duration n/a"
+_DISTANCE_NA = "distance n/a"
+
 
 @tool
 def save_to_md_file(content: str) -> str:
@@ -23,8 +30,7 @@ def save_to_md_file(content: str) -> str:
         str: File path.
     """
     path = build_file_path(".md")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+    Path(path).write_bytes(content.encode("utf-8"))
     return path
 
 
@@ -39,8 +45,7 @@ def save_to_txt_file(content: str) -> str:
         str: File path.
     """
     path = build_file_path(".txt")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+    Path(path).write_bytes(content.encode("utf-8"))
     return path
 
 
@@ -92,31 +97,9 @@ def log_workout(workout: dict) -> str:
     except ValueError as exc:
         return f"Invalid workout payload: {exc}"
 
-    workout_id = create_workout(
-        workout_date=normalized.workout_date, notes=normalized.notes or ""
-    )
-
-    exercise_count = 0
-    set_count = 0
-    for entry in normalized.entries:
-        set_rows = []
-        for i, s in enumerate(entry.sets, start=1):
-            set_rows.append(
-                {
-                    "set_number": s.set_number or i,
-                    "reps": s.reps,
-                    "weight": s.weight,
-                    "duration_minutes": s.duration_minutes,
-                    "distance_km": s.distance_km,
-                    "notes": merge_set_notes(s.notes),
-                }
-            )
-
-        add_sets(
-            workout_id=workout_id, exercise_name=entry.exercise_name, set_rows=set_rows
-        )
-        exercise_count += 1
-        set_count += len(set_rows)
+    workout_id = create_workout_with_entries(normalized)
+    exercise_count = len(normalized.entries)
+    set_count = sum(len(entry.sets) for entry in normalized.entries)
 
     return f"Logged workout #{workout_id} on {normalized.workout_date} with {exercise_count} exercises and {set_count} sets."
 
@@ -136,21 +119,14 @@ def get_exercise_progress(exercise_name: str, limit: int = 200) -> str:
     if not rows:
         return f"No logged sets found for {exercise_name}."
 
-    lines = []
-    for workout_date, reps, weight, duration_minutes, distance_km in rows:
-        reps_text = f"{reps} reps" if reps is not None else "reps n/a"
-        weight_text = f"{weight}" if weight is not None else "weight n/a"
-        duration_text = (
-            f"{duration_minutes} min"
-            if duration_minutes is not None
-            else "duration n/a"
-        )
-        distance_text = (
-            f"{distance_km} km" if distance_km is not None else "distance n/a"
-        )
-        lines.append(
-            f"{workout_date}: {reps_text}, {weight_text}, {duration_text}, {distance_text}"
-        )
+    lines = [
+        f"{workout_date}: "
+        f"{_REPS_NA if reps is None else f'{reps} reps'}, "
+        f"{_WEIGHT_NA if weight is None else weight}, "
+        f"{_DURATION_NA if duration_minutes is None else f'{duration_minutes} min'}, "
+        f"{_DISTANCE_NA if distance_km is None else f'{distance_km} km'}"
+        for workout_date, reps, weight, duration_minutes, distance_km in rows
+    ]
     return "\n".join(lines)
 
 
@@ -162,7 +138,7 @@ def get_last_workout(request: str) -> str:
         request (str): Must be "last_workout".
 
     Returns:
-        str: Raw DB data for the most recent workout and all its sets in string form.
+        str: Raw DB data for the most recent workout and all its sets as a JSON string.
     """
     if not request or not str(request).strip():
         return "Missing request. Use request='last_workout'."
@@ -170,7 +146,7 @@ def get_last_workout(request: str) -> str:
     workout, sets = get_last_workout_with_sets()
     if workout is None:
         return "No workouts logged yet."
-    return str({"workout": workout, "sets": sets})
+    return orjson.dumps({"workout": workout, "sets": sets}).decode()
 
 
 @tool
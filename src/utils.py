@@ -4,7 +4,9 @@ import tempfile
 import uuid
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Optional
+
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TODAY_ALIASES = frozenset({"today", "todays", "today's"})
 
 
 def generated_files_dir() -> Path:
@@ -42,27 +44,13 @@ def normalize_date_input(date_text: str) -> str:
     raw = (date_text or "").strip().lower()
     today = date.today()
 
-    if raw in {"today", "todays", "today's"}:
+    if raw in _TODAY_ALIASES:
         return today.isoformat()
     if raw == "yesterday":
         return (today - timedelta(days=1)).isoformat()
     if raw == "tomorrow":
         return (today + timedelta(days=1)).isoformat()
-    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", raw):
+    if _ISO_DATE_RE.fullmatch(raw):
         return raw
     return date_text
 
-
-def merge_set_notes(notes: Optional[str]) -> Optional[str]:
-    """Merge notes into a single string joined by |.
-
-    Args:
-        Optional[str]: The notes to merge.
-
-    Returns:
-        Optional[str]: The merged notes (or None if no notes).
-    """
-    parts: list[str] = []
-    if notes:
-        parts.append(str(notes))
-    return " | ".join(parts) if parts else None
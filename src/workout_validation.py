@@ -3,7 +3,7 @@ from datetime import date
 from typing import Any, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class SetEntry:
     set_number: Optional[int] = None
     reps: Optional[int] = None
@@ -13,13 +13,13 @@ class SetEntry:
     notes: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExerciseEntry:
     exercise_name: str
     sets: List[SetEntry]
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkoutLog:
     workout_date: str  # YYYY-MM-DD
     notes: Optional[str]
@@ -37,6 +37,8 @@ def _ensure_int(x: Any) -> Optional[int]:
     """
     if x is None or isinstance(x, bool):
         return None
+    if isinstance(x, int):
+        return x
     try:
         return int(x)
     except Exception:
@@ -54,6 +56,10 @@ def _ensure_float(x: Any) -> Optional[float]:
     """
     if x is None or isinstance(x, bool):
         return None
+    if isinstance(x, float):
+        return x
+    if isinstance(x, int):
+        return float(x)
     try:
         return float(x)
     except Exception:
@@ -123,8 +129,7 @@ def validate_and_normalize_workout_payload(data: Any) -> WorkoutLog:
             if notes is not None:
                 notes = str(notes).strip() or None
 
-            has_metrics = any(v is not None for v in (reps, weight, duration, distance))
-            if not has_metrics:
+            if reps is None and weight is None and duration is None and distance is None:
                 raise ValueError(
                     f"A set in '{name}' is missing metrics (reps/weight/duration/distance)."
                 )